@@ -1,64 +1,124 @@
 # codegen.py
 # Intermediate Code Generator (TAC) for Mini C Compiler
 
+import operator
+import sys
+
 from parser import (
     Program, Function, Declaration, Assignment, Return,
     Print, If, While, FuncCall, Var, Number, BinOp, String
 )
 
 
+# Compile-time evaluation of binops on two int literals; mirrors the
+# interpreter (division by zero gives 0, comparisons give 0/1)
+FOLD_OPS = {
+    "PLUS": operator.add,
+    "MINUS": operator.sub,
+    "MUL": operator.mul,
+    "DIV": lambda a, b: a // b if b != 0 else 0,
+    "EQ": lambda a, b: int(a == b),
+    "NE": lambda a, b: int(a != b),
+    "GT": lambda a, b: int(a > b),
+    "LT": lambda a, b: int(a < b),
+    "GE": lambda a, b: int(a >= b),
+    "LE": lambda a, b: int(a <= b),
+}
+
+# Comparison -> fused branch taken when the comparison is false
+# (IF_NOT_LT a, b, L jumps to L unless a < b)
+BRANCH_IF_NOT = {
+    "EQ": "IF_NOT_EQ", "NE": "IF_NOT_NE", "GT": "IF_NOT_GT",
+    "LT": "IF_NOT_LT", "GE": "IF_NOT_GE", "LE": "IF_NOT_LE",
+}
+
+
 class CodeGenerator:
     def __init__(self, ast):
         self.ast = ast
         self.code = []
-        self.temp_count = 0
+        self.free_temps = []  # released temporaries, reused before new ones
+        self.next_temp = 0
+        self.temps = set()
         self.label_count = 0
+        self.labels = {}     # label -> index in self.code
+        self.functions = {}  # function name -> index of its FUNC instruction
+        self.slots = {}      # function name -> {variable/temp name: slot index}
+        self.slot_map = {}   # slot table of the function being generated
+
+    def slot(self, name):
+        return self.slot_map.setdefault(name, len(self.slot_map))
 
     def new_temp(self):
-        self.temp_count += 1
-        return f"t{self.temp_count}"
+        if self.free_temps:
+            t = self.free_temps.pop()
+        else:
+            self.next_temp += 1
+            t = sys.intern(f"t{self.next_temp}")
+            self.temps.add(t)
+        self.slot(t)
+        return t
+
+    def release(self, val):
+        # hand a temporary back once its value has been read
+        if val in self.temps:
+            self.free_temps.append(val)
 
     def new_label(self, base="L"):
         self.label_count += 1
-        return f"{base}{self.label_count}"
+        return sys.intern(f"{base}{self.label_count}")
 
     def emit(self, op, a1=None, a2=None, res=None):
+        if op == "LABEL":
+            self.labels[a1] = len(self.code)
+        elif op == "FUNC":
+            self.functions[a1] = len(self.code)
         self.code.append((op, a1, a2, res))
 
     def generate(self):
         for func in self.ast.functions:
+            self.slot_map = self.slots[func.name] = {}
             self.emit("FUNC", func.name, None, None)
             # Declare parameters
             for p in func.params:
+                self.slot(p)
                 self.emit("PARAM_DECL", p, None, None)
             for stmt in func.body:
                 self.generate_statement(stmt)
             self.emit("END_FUNC", func.name, None, None)
+        # Intern every string field so env/label lookups downstream hit on
+        # pointer identity
+        intern = sys.intern
+        self.code = [tuple(intern(x) if type(x) is str else x for x in instr) for instr in self.code]
         return self.code
 
     def generate_statement(self, stmt):
         if isinstance(stmt, Declaration):
+            self.slot(stmt.var_name)
             if stmt.value:
-                val = self.generate_expression(stmt.value)
-                self.emit("MOV", val, None, stmt.var_name)
+                self.generate_store(stmt.value, stmt.var_name)
 
         elif isinstance(stmt, Assignment):
-            val = self.generate_expression(stmt.value)
-            self.emit("MOV", val, None, stmt.var_name)
+            self.generate_store(stmt.value, stmt.var_name)
 
         elif isinstance(stmt, Return):
             val = self.generate_expression(stmt.value)
             self.emit("RET", val, None, None)
+            self.release(val)
 
         elif isinstance(stmt, Print):
-            val = self.generate_expression(stmt.value)
-            self.emit("PRINT", val, None, None)
+            if isinstance(stmt.value, String):
+                # the text is known now; nothing to read at run time
+                self.emit("PRINT_STR", self.generate_expression(stmt.value), None, None)
+            else:
+                val = self.generate_expression(stmt.value)
+                self.emit("PRINT", val, None, None)
+                self.release(val)
 
         elif isinstance(stmt, If):
-            cond = self.generate_expression(stmt.condition)
             else_label = self.new_label("ELSE")
             end_label = self.new_label("ENDIF")
-            self.emit("IFZ_GOTO", cond, None, else_label)
+            self.generate_branch_if_false(stmt.condition, else_label)
             for s in stmt.then_body:
                 self.generate_statement(s)
             self.emit("GOTO", end_label, None, None)
@@ -72,29 +132,55 @@ class CodeGenerator:
             start_label = self.new_label("WHILE_START")
             end_label = self.new_label("WHILE_END")
             self.emit("LABEL", start_label, None, None)
-            cond = self.generate_expression(stmt.condition)
-            self.emit("IFZ_GOTO", cond, None, end_label)
+            self.generate_branch_if_false(stmt.condition, end_label)
             for s in stmt.body:
                 self.generate_statement(s)
             self.emit("GOTO", start_label, None, None)
             self.emit("LABEL", end_label, None, None)
 
         elif isinstance(stmt, FuncCall):
-            self.generate_expression(stmt)  # for standalone calls
+            self.release(self.generate_expression(stmt))  # for standalone calls
 
         else:
             raise Exception(f"Unknown statement type: {type(stmt).__name__}")
 
-    def generate_expression(self, expr):
+    def generate_store(self, expr, var):
+        # A binop or call writes the variable itself: `x = a + b` is one
+        # PLUS a, b -> x, with no temp (or frame slot) for the result
+        if isinstance(expr, (BinOp, FuncCall)):
+            val = self.generate_expression(expr, var)
+            if val == var:
+                return
+        else:
+            val = self.generate_expression(expr)
+        self.emit("MOV", val, None, var)
+
+    def generate_branch_if_false(self, cond, label):
+        # A comparison jumps with one fused IF_NOT_<cmp> instead of computing
+        # a 0/1 temp for IFZ_GOTO
+        if isinstance(cond, BinOp) and cond.op in BRANCH_IF_NOT:
+            left = self.generate_expression(cond.left)
+            right = self.generate_expression(cond.right)
+            if not (type(left) is int and type(right) is int):
+                self.emit(BRANCH_IF_NOT[cond.op], left, right, label)
+                self.release(left)
+                self.release(right)
+                return
+            val = FOLD_OPS[cond.op](left, right)
+        else:
+            val = self.generate_expression(cond)
+        self.emit("IFZ_GOTO", val, None, label)
+        self.release(val)
+
+    def generate_expression(self, expr, dest=None):
+        # Literals are returned as operands directly (int, or quoted string)
+        # instead of being loaded into a temporary first. A binop or call
+        # stores its result in dest when given, else in a new temp.
         if isinstance(expr, Number):
-            t = self.new_temp()
-            self.emit("MOV", expr.value, None, t)
-            return t
+            return expr.value
 
-        elif isinstance(expr, String):  
-            t = self.new_temp()
-            self.emit("MOV", f'"{expr.value}"', None, t)
-            return t
+        elif isinstance(expr, String):
+            return f'"{expr.value}"'
 
         elif isinstance(expr, Var):
             return expr.name
@@ -102,18 +188,28 @@ class CodeGenerator:
         elif isinstance(expr, BinOp):
             left = self.generate_expression(expr.left)
             right = self.generate_expression(expr.right)
-            t = self.new_temp()
+            # constant folding; folded children make whole constant chains fold
+            if type(left) is int and type(right) is int and expr.op in FOLD_OPS:
+                return FOLD_OPS[expr.op](left, right)
+            t = dest or self.new_temp()
             self.emit(expr.op, left, right, t)
+            self.release(left)
+            self.release(right)
             return t
 
         elif isinstance(expr, FuncCall):
-            # evaluate arguments in order
+            # evaluate arguments in order; CALL reads them, so argument
+            # temporaries stay live until it has been emitted
+            arg_vals = []
             for arg in expr.args:
                 arg_val = self.generate_expression(arg)
                 self.emit("PARAM", arg_val, None, None)
-            self.emit("CALL", expr.name, len(expr.args), None)
-            t = self.new_temp()
-            self.emit("POP", None, None, t)
+                arg_vals.append(arg_val)
+            # CALL stores the return value in its result operand directly
+            t = dest or self.new_temp()
+            self.emit("CALL", expr.name, len(expr.args), t)
+            for arg_val in arg_vals:
+                self.release(arg_val)
             return t
 
         else:
@@ -1,14 +1,12 @@
 # LEXICAL ANALYZER (Tokenizer)
 
 import re
+import sys
+from collections import namedtuple
 
-# Token Class
-class Token:
-    def __init__(self, type_, value, line, col):
-        self.type = type_
-        self.value = value
-        self.line = line
-        self.col = col
+# Token Class: an immutable (type, value, line, col) tuple with named fields
+class Token(namedtuple("Token", "type value line col")):
+    __slots__ = ()
 
     def __repr__(self):
         return f"Token('{self.type}', '{self.value}', line={self.line}, col={self.col})"
@@ -38,7 +36,6 @@ TOKEN_SPEC = [
     ("SEMI",    r';'),
     ("NEWLINE", r'\n'),
     ("SKIP",    r'[ \t]+'),
-    ("MISMATCH", r'.'),
 ]
 
 # Reserved keywords
@@ -51,36 +48,69 @@ KEYWORDS = {
     "print": "PRINT",
 }
 
+# Combined token regex, compiled once at import time
+_TOK_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in TOKEN_SPEC))
+
+_keyword_kind = KEYWORDS.get
+_intern = sys.intern
+
+# Token kinds that produce no token
+_SKIP = frozenset({"SKIP", "COMMENT"})
+
+# Per-kind value handlers returning (kind, value); other kinds keep the match as is
+def _h_id(value):
+    # identifiers end up as dict keys throughout the pipeline
+    return _keyword_kind(value, "ID"), _intern(value)
+
+def _h_string(value):
+    return "STRING", value.strip('"')
+
+_HANDLERS = {
+    "ID": _h_id,
+    "STRING": _h_string,
+}
+
+def _unexpected(code, pos, line_num):
+    raise SyntaxError(f"Unexpected character {code[pos]!r} at line {line_num}")
+
+# Builds a Token straight from a 4-tuple, skipping the Python-level __new__
+_new_token = tuple.__new__
+
 # Tokenizer
+# Matches are taken back to back: each one is anchored where the previous
+# one ended. There is no catch-all rule, so the scan stops at the first
+# character no rule matches, which is reported as an error.
 def tokenize(code):
-    tok_regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in TOKEN_SPEC)
     line_num = 1
     line_start = 0
     tokens = []
+    tokens_append = tokens.append
+    handlers = _HANDLERS
+    skip = _SKIP
+    match = _TOK_RE.match
+    end = len(code)
+    pos = 0
 
-    for mo in re.finditer(tok_regex, code):
+    while pos < end:
+        mo = match(code, pos)
+        if mo is None:
+            _unexpected(code, pos, line_num)
+        pos = mo.end()
         kind = mo.lastgroup
         value = mo.group()
-        col = mo.start() - line_start + 1
 
         if kind == "NEWLINE":
-            line_start = mo.end()
+            line_start = pos
             line_num += 1
             continue
 
-        elif kind in ("SKIP", "COMMENT"):
+        if kind in skip:
             continue
+        handler = handlers.get(kind)
+        if handler is not None:
+            kind, value = handler(value)
 
-        elif kind == "ID" and value in KEYWORDS:
-            kind = KEYWORDS[value]
-
-        elif kind == "STRING":
-            value = value.strip('"')
-
-        elif kind == "MISMATCH":
-            raise SyntaxError(f"Unexpected character {value!r} at line {line_num}")
-
-        tokens.append(Token(kind, value, line_num, col))
+        tokens_append(_new_token(Token, (kind, value, line_num, mo.start() - line_start + 1)))
 
-    tokens.append(Token("EOF", "", line_num, 1))
+    tokens_append(Token("EOF", "", line_num, 1))
     return tokens
@@ -1,12 +1,16 @@
 # main.py
 # Mini C Compiler + TAC Interpreter (with string literal support)
 
+import operator
+from array import array
+
 from lexical import tokenize
 from parser import Parser, pretty_print_ast
 from semantic import SemanticAnalyzer
-from codegen import CodeGenerator
+from codegen import CodeGenerator, BRANCH_IF_NOT, FOLD_OPS
 from optimizer import Optimizer
 from targetgen import TargetCodeGenerator
+from pygen import TACToPyAst
 
 def read_source(filename="test.c"):
     try:
@@ -16,61 +20,238 @@ def read_source(filename="test.c"):
         print(f"[ERROR] File '{filename}' not found!")
         return ""
 
+_BIN_SYM = {
+    "PLUS": "+", "MINUS": "-", "MUL": "*", "DIV": "/",
+    "EQ": "==", "NE": "!=", "GT": ">", "LT": "<", "GE": ">=", "LE": "<="
+}
+
+def _fmt_binop(instr):
+    op, a1, a2, res = instr
+    return f"  {res} = {a1} {_BIN_SYM[op]} {a2}"
+
+def _fmt_default(instr):
+    return "  " + " ".join(str(x) for x in instr)
+
+# TAC opcode -> formatter taking the whole (op, a1, a2, res) instruction
+_FMT = {
+    "FUNC": lambda i: f"{i[1]}:",
+    "END_FUNC": lambda i: f"END {i[1]}",
+    "PARAM_DECL": lambda i: f"  PARAM_DECL {i[1]}",
+    "MOV": lambda i: f"  {i[3]} = {i[1]}",
+    "RET": lambda i: f"  return {i[1]}",
+    "PRINT": lambda i: f"  print {i[1]}",
+    "PRINT_STR": lambda i: f"  print {i[1]}",
+    "IFZ_GOTO": lambda i: f"  IFZ {i[1]} -> {i[3]}",
+    "GOTO": lambda i: f"  GOTO {i[1]}",
+    "LABEL": lambda i: f"{i[1]}:",
+    "PARAM": lambda i: f"  PARAM {i[1]}",
+    "CALL": lambda i: f"  {i[3]} = CALL {i[1]}, {i[2]}" if i[3] else f"  CALL {i[1]}, {i[2]}",
+    "POP": lambda i: f"  POP {i[3]}",
+}
+_FMT.update(dict.fromkeys(_BIN_SYM, _fmt_binop))
+for _cmp, _branch in BRANCH_IF_NOT.items():
+    _FMT[_branch] = lambda i, sym=_BIN_SYM[_cmp]: f"  IFZ {i[1]} {sym} {i[2]} -> {i[3]}"
+
 def format_tac(tac):
-    lines = []
-    for instr in tac:
-        op, a1, a2, res = instr
-        if op == "FUNC":
-            lines.append(f"{a1}:")
-        elif op == "END_FUNC":
-            lines.append(f"END {a1}")
-        elif op == "PARAM_DECL":
-            lines.append(f"  PARAM_DECL {a1}")
-        elif op == "MOV":
-            lines.append(f"  {res} = {a1}")
-        elif op in ("PLUS", "MINUS", "MUL", "DIV", "EQ", "NE", "GT", "LT", "GE", "LE"):
-            sym = {
-                "PLUS": "+", "MINUS": "-", "MUL": "*", "DIV": "/",
-                "EQ": "==", "NE": "!=", "GT": ">", "LT": "<", "GE": ">=", "LE": "<="
-            }[op]
-            lines.append(f"  {res} = {a1} {sym} {a2}")
-        elif op == "RET":
-            lines.append(f"  return {a1}")
-        elif op == "PRINT":
-            lines.append(f"  print {a1}")
-        elif op == "IFZ_GOTO":
-            lines.append(f"  IFZ {a1} -> {res}")
-        elif op == "GOTO":
-            lines.append(f"  GOTO {a1}")
-        elif op == "LABEL":
-            lines.append(f"{a1}:")
-        elif op == "PARAM":
-            lines.append(f"  PARAM {a1}")
-        elif op == "CALL":
-            lines.append(f"  CALL {a1}, {a2}")
-        elif op == "POP":
-            lines.append(f"  POP {res}")
-        else:
-            lines.append("  " + " ".join(str(x) for x in instr))
-    return "\n".join(lines)
+    return "\n".join(_FMT.get(instr[0], _fmt_default)(instr) for instr in tac)
+
+# Integer opcodes executed by the interpreter (the TAC itself keeps string names)
+OP_COUNT = 30
+(OP_MOV, OP_PLUS, OP_MINUS, OP_MUL, OP_DIV, OP_EQ, OP_NE, OP_GT, OP_LT, OP_GE, OP_LE,
+ OP_PARAM, OP_CALL, OP_POP, OP_PRINT, OP_IFZ_GOTO, OP_GOTO, OP_LABEL, OP_RET,
+ OP_FUNC, OP_END_FUNC, OP_PARAM_DECL, OP_NOP,
+ OP_IF_NOT_EQ, OP_IF_NOT_NE, OP_IF_NOT_GT, OP_IF_NOT_LT, OP_IF_NOT_GE, OP_IF_NOT_LE,
+ OP_PRINT_STR) = range(OP_COUNT)
+
+OPCODES = {
+    "MOV": OP_MOV, "PLUS": OP_PLUS, "MINUS": OP_MINUS, "MUL": OP_MUL, "DIV": OP_DIV,
+    "EQ": OP_EQ, "NE": OP_NE, "GT": OP_GT, "LT": OP_LT, "GE": OP_GE, "LE": OP_LE,
+    "PARAM": OP_PARAM, "CALL": OP_CALL, "POP": OP_POP, "PRINT": OP_PRINT, "PRINT_STR": OP_PRINT_STR,
+    "IFZ_GOTO": OP_IFZ_GOTO, "GOTO": OP_GOTO, "LABEL": OP_LABEL, "RET": OP_RET,
+    "FUNC": OP_FUNC, "END_FUNC": OP_END_FUNC, "PARAM_DECL": OP_PARAM_DECL,
+    "IF_NOT_EQ": OP_IF_NOT_EQ, "IF_NOT_NE": OP_IF_NOT_NE, "IF_NOT_GT": OP_IF_NOT_GT,
+    "IF_NOT_LT": OP_IF_NOT_LT, "IF_NOT_GE": OP_IF_NOT_GE, "IF_NOT_LE": OP_IF_NOT_LE,
+}
+OP_NAMES = {code: name for name, code in OPCODES.items()}
+
+# Arithmetic/comparison opcode -> function; the same FOLD_OPS functions the
+# compiler folds constants with, so compile time and run time agree
+_BINFUNC = {OPCODES[name]: func for name, func in FOLD_OPS.items()}
+BIN_OPS = frozenset(_BINFUNC)
+
+# Comparison opcode -> operator test (bool result)
+_CMP_TESTS = {
+    OP_EQ: operator.eq, OP_NE: operator.ne, OP_GT: operator.gt,
+    OP_LT: operator.lt, OP_GE: operator.ge, OP_LE: operator.le,
+}
+# Fused branch opcode -> (comparison opcode, test); the branch to res is
+# taken when the test is false
+_IF_NOT = {
+    OP_IF_NOT_EQ: (OP_EQ, _CMP_TESTS[OP_EQ]),
+    OP_IF_NOT_NE: (OP_NE, _CMP_TESTS[OP_NE]),
+    OP_IF_NOT_GT: (OP_GT, _CMP_TESTS[OP_GT]),
+    OP_IF_NOT_LT: (OP_LT, _CMP_TESTS[OP_LT]),
+    OP_IF_NOT_GE: (OP_GE, _CMP_TESTS[OP_GE]),
+    OP_IF_NOT_LE: (OP_LE, _CMP_TESTS[OP_LE]),
+}
+
+# Conditional jumps, whose label is in res (GOTO keeps its label in a1)
+_BRANCH_OPS = frozenset(_IF_NOT) | {OP_IFZ_GOTO}
+
+# Opcodes whose a1 field is a value operand (binops and fused branches also read a2)
+_TWO_OPERAND_OPS = BIN_OPS | frozenset(_IF_NOT)
+_A1_OPERAND_OPS = _TWO_OPERAND_OPS | {OP_MOV, OP_PARAM, OP_PRINT, OP_IFZ_GOTO, OP_RET}
+# Opcodes whose res field names the variable they write
+_RES_SLOT_OPS = BIN_OPS | {OP_MOV, OP_POP, OP_CALL}
 
 # TAC Interpreter (supports strings and numbers)
 class TACInterpreter:
-    def __init__(self, tac):
+    def __init__(self, tac, slots=None, labels=None, functions=None):
         self.tac = tac
-        self.labels = {}      # label -> index
-        self.functions = {}   # func_name -> FUNC index
-        self.env_stack = []   # stack of env dicts for nested function executions
-        self.params = []      # global param stack (flat)
-        self.output = []
+        self.slots = slots or {}  # func_name -> {name: slot}, e.g. CodeGenerator.slots
+        self.code = []        # tac lowered to (opcode int, a1, a2, res), PARAMs folded into CALL, no LABELs
+        self.ops = array("i") # opcode column of self.code, for opcode-only scans
+        self.threaded = []    # self.code with each opcode replaced by its handler (None: CALL/RET/END_FUNC)
+        # label -> index and func_name -> FUNC index in self.code; when the
+        # producer of tac already recorded them for the TAC (Optimizer.labels/
+        # functions) they are translated instead of rebuilt
+        self.indexed = labels is not None and functions is not None
+        self.tac_labels = labels
+        self.tac_functions = functions
+        self.labels = {}
+        self.functions = {}
+        self.frame_templates = {} # func_name -> initial env: zeroed variables + literal slots
+        self.entries = {}     # func_name -> (body pc, PARAM_DECL slots, frame template)
+        self.last_return = 0  # value of the latest CALL, read by a following POP
+        self.output = []      # printed values as they were, stringified by get_output_text
         self.return_value = 0
 
+        # Opcode -> handler(env, a1, a2, res, pc) returning the next pc, built
+        # once; only CALL, RET and END_FUNC, which switch frames, are handled
+        # in run_func itself
+        handlers = {op: self._binary_handler(op) for op in BIN_OPS}
+        handlers.update({op: self._branch_handler(op) for op in _IF_NOT})
+        handlers.update({
+            OP_MOV: self._op_mov,
+            OP_POP: self._op_pop,
+            OP_PRINT: self._op_print,
+            OP_PRINT_STR: self._op_print_str,
+            OP_IFZ_GOTO: self._op_ifz_goto,
+            OP_GOTO: self._op_goto,
+            OP_LABEL: self._op_nop,
+            OP_FUNC: self._op_nop,
+            OP_PARAM_DECL: self._op_nop,
+            OP_NOP: self._op_nop,
+        })
+        # indexed by opcode, None for the frame-switching opcodes
+        self.handlers = [handlers.get(op) for op in range(OP_COUNT)]
+
     def build_indices(self):
-        for idx, (op, a1, a2, res) in enumerate(self.tac):
-            if op == "LABEL" and a1:
-                self.labels[a1] = idx
-            if op == "FUNC" and a1:
-                self.functions[a1] = idx
+        # Lower every instruction to an integer opcode once, so the run loop
+        # never compares opcode strings. Unknown ops become no-ops. Every value
+        # operand is resolved to a slot of its function's env list: variables
+        # get zeroed slots, literals get slots preloaded with their value.
+        # PARAM rows are dropped: the argument slots they push are attached to
+        # the CALL that consumes them, as a tuple in its a2 field. LABEL rows
+        # are dropped too, a label indexing the row that followed it.
+        code = []
+        new_index = []        # TAC index -> index in code
+        pending_args = []     # slots pushed by PARAMs not yet taken by a CALL
+        resolve = self.resolve_operand
+        indexed = self.indexed
+        labels = self.labels
+        functions = self.functions
+        slots_get = self.slots.get
+        opcode_of = OPCODES.get
+        new_index_append = new_index.append
+        code_append = code.append
+        slot_maps = {}
+        slot_map = {}
+        for op, a1, a2, res in self.tac:
+            new_index_append(len(code))
+            opcode = opcode_of(op, OP_NOP)
+            if opcode == OP_LABEL:
+                if a1 and not indexed:
+                    labels[a1] = len(code)
+                continue
+            if opcode == OP_FUNC and a1:
+                if not indexed:
+                    functions[a1] = len(code)
+                slot_map = slot_maps[a1] = dict(slots_get(a1, ()))
+            if opcode in _A1_OPERAND_OPS:
+                a1 = resolve(a1, slot_map)
+                if opcode in _TWO_OPERAND_OPS:
+                    a2 = resolve(a2, slot_map)
+            elif opcode == OP_PARAM_DECL:
+                a1 = slot_map.setdefault(a1, len(slot_map))
+            elif opcode == OP_PRINT_STR:
+                a1 = a1[1:-1]  # the text itself, unquoted
+            if opcode in _RES_SLOT_OPS and res is not None:
+                res = slot_map.setdefault(res, len(slot_map))
+
+            if opcode == OP_PARAM:
+                pending_args.append(a1)
+                continue
+            if opcode == OP_CALL:
+                base = max(len(pending_args) - (int(a2) if a2 is not None else 0), 0)
+                a2 = tuple(pending_args[base:])
+                del pending_args[base:]
+            code_append((opcode, a1, a2, res))
+        self.code = code
+        self.ops = array("i", [row[0] for row in code])
+
+        if indexed:
+            self.labels = {name: new_index[i] for name, i in self.tac_labels.items()}
+            self.functions = {name: new_index[i] for name, i in self.tac_functions.items()}
+
+        # Jump targets become code indices so branches never look up labels;
+        # a missing label jumps to the jump itself, as labels.get(label, pc) did
+        label_pc = self.labels.get
+        for idx, (opcode, a1, a2, res) in enumerate(code):
+            if opcode == OP_GOTO:
+                code[idx] = (opcode, label_pc(a1, idx), a2, res)
+            elif opcode in _BRANCH_OPS:
+                code[idx] = (opcode, a1, a2, label_pc(res, idx))
+
+        has_strings = False
+        for name, slot_map in slot_maps.items():
+            template = [0] * len(slot_map)
+            for key, slot in slot_map.items():
+                if type(key) is tuple:
+                    template[slot] = key[1]
+                    has_strings = has_strings or key[0] == "S"
+            self.frame_templates[name] = template
+
+        # Parameter slots are read off the PARAM_DECL rows once, so a call
+        # binds arguments without scanning the callee's prologue
+        ops = self.ops
+        for name, start in self.functions.items():
+            pc = start + 1
+            while pc < len(code) and ops[pc] == OP_PARAM_DECL:
+                pc += 1
+            params = tuple(row[1] for row in code[start + 1:pc])
+            self.entries[name] = (pc, params, self.frame_templates.get(name, []))
+
+        # Without string literals every value is an int, so arithmetic and
+        # branches can run without the string checks
+        if not has_strings:
+            handlers = self.handlers
+            for op in BIN_OPS:
+                handlers[op] = self._int_binary_handler(op)
+            for op in _IF_NOT:
+                handlers[op] = self._int_branch_handler(op)
+            handlers[OP_IFZ_GOTO] = self._op_int_ifz_goto
+
+        # Threaded code: a step unpacks one row that already holds its
+        # handler; only frame-switching rows go back to the ops column. A
+        # CALL row carries its callee's entry (None if there is no such
+        # function) in place of the name, so calls do no lookup
+        handlers = self.handlers
+        entry_of = self.entries.get
+        self.threaded = [
+            (None, entry_of(a1), a2, res) if op == OP_CALL else (handlers[op], a1, a2, res)
+            for op, a1, a2, res in code
+        ]
 
     def _is_string_literal(self, token_value):
         
@@ -78,29 +259,21 @@ class TACInterpreter:
             return False
         return isinstance(token_value, str) and len(token_value) >= 2 and token_value[0] == '"' and token_value[-1] == '"'
 
-    def get_val_from_env(self, env, val):
-
+    def resolve_operand(self, val, slot_map):
+        # Map a TAC operand to its env slot. Variables are keyed by name and
+        # literals by ("I", int) / ("S", str), so the two never collide.
         if val is None:
-            return 0
-        
-        if isinstance(val, int) or isinstance(val, str) and not val:
-            pass
-
-        if self._is_string_literal(val):
-            return val[1:-1]  
-        
-        try:
-            return int(val)
-        except (ValueError, TypeError):
-
-            if not self.env_stack:
-                return 0
-
-            for env in reversed(self.env_stack):
-                if val in env:
-                    return env[val]
+            key = ("I", 0)
+        elif isinstance(val, int):
+            key = ("I", val)
+        elif self._is_string_literal(val):
+            key = ("S", val[1:-1])
+        elif val.lstrip("-").isdigit():
+            key = ("I", int(val))
+        else:
+            key = val
 
-            return 0
+        return slot_map.setdefault(key, len(slot_map))
 
     def _ensure_int(self, v, op_name):
         if isinstance(v, str):
@@ -111,128 +284,167 @@ class TACInterpreter:
                 raise RuntimeError(f"[Runtime] Cannot use string value '{v}' in numeric operation '{op_name}'")
         return v
 
-    def run_func(self, func_name, args):
-
-        if func_name not in self.functions:
+    # Instruction handlers
+    def _op_mov(self, env, a1, a2, res, pc):
+        env[res] = env[a1]
+        return pc + 1
+
+    def _coerce(self, op, left, right):
+        # operands of a binop where at least one is a string: EQ/NE compare
+        # text, everything else needs numbers
+        if op == OP_EQ or op == OP_NE:
+            return str(left), str(right)
+        return self._ensure_int(left, OP_NAMES[op]), self._ensure_int(right, OP_NAMES[op])
+
+    def _binary_handler(self, op):
+        # one handler per arithmetic/comparison opcode, with its function bound
+        func = _BINFUNC[op]
+        coerce = self._coerce
+
+        def handler(env, a1, a2, res, pc):
+            left = env[a1]
+            right = env[a2]
+
+            if isinstance(left, str) or isinstance(right, str):
+                left, right = coerce(op, left, right)
+
+            env[res] = func(left, right)
+            return pc + 1
+        return handler
+
+    def _branch_handler(self, op):
+        cmp_op, test = _IF_NOT[op]
+        coerce = self._coerce
+
+        def handler(env, a1, a2, res, pc):
+            left = env[a1]
+            right = env[a2]
+            if isinstance(left, str) or isinstance(right, str):
+                left, right = coerce(cmp_op, left, right)
+            return pc + 1 if test(left, right) else res
+        return handler
+
+    def _int_binary_handler(self, op):
+        test = _CMP_TESTS.get(op)
+        if test is not None:
+            # comparisons call the C operator test and pick 0/1 in one
+            # expression, instead of a Python lambda wrapping int(a < b)
+            def handler(env, a1, a2, res, pc):
+                env[res] = 1 if test(env[a1], env[a2]) else 0
+                return pc + 1
+            return handler
+
+        func = _BINFUNC[op]
+
+        def handler(env, a1, a2, res, pc):
+            env[res] = func(env[a1], env[a2])
+            return pc + 1
+        return handler
+
+    def _int_branch_handler(self, op):
+        test = _IF_NOT[op][1]
+
+        def handler(env, a1, a2, res, pc):
+            return pc + 1 if test(env[a1], env[a2]) else res
+        return handler
+
+    # Conditional jumps select the next pc in one expression; res is the
+    # target pc resolved by build_indices
+    def _op_ifz_goto(self, env, a1, a2, res, pc):
+        return res if self._ensure_int(env[a1], "IFZ_GOTO") == 0 else pc + 1
+
+    def _op_int_ifz_goto(self, env, a1, a2, res, pc):
+        return pc + 1 if env[a1] else res
+
+    def _op_goto(self, env, a1, a2, res, pc):
+        return a1
+
+    def _op_pop(self, env, a1, a2, res, pc):
+        env[res] = self.last_return
+        return pc + 1
+
+    def _op_print(self, env, a1, a2, res, pc):
+        v = env[a1]
+        print(v)
+        self.output.append(v)
+        return pc + 1
+
+    def _op_print_str(self, env, a1, a2, res, pc):
+        print(a1)
+        self.output.append(a1)
+        return pc + 1
+
+    def _op_nop(self, env, a1, a2, res, pc):
+        return pc + 1
+
+    def enter_func(self, func_name, args):
+        # Create the callee's env, bind its PARAM_DECL slots to args and
+        # return (pc of the first body instruction, env); missing arguments
+        # stay 0 and extra ones are ignored
+        entry = self.entries.get(func_name)
+        if entry is None:
             raise RuntimeError(f"[Runtime] Function '{func_name}' not found")
 
-        # Create local environment and bind PARAM_DECL entries to args
-        env = {}
-        f_start = self.functions[func_name]
-        pc = f_start + 1
-
-        # Bind parameters according to PARAM_DECL entries in function prologue
-        param_idx = 0
-        while pc < len(self.tac) and self.tac[pc][0] == "PARAM_DECL":
-            _, pname, _, _ = self.tac[pc]
-            if param_idx < len(args):
-                env[pname] = args[param_idx]
-            else:
-                env[pname] = 0
-            param_idx += 1
-            pc += 1
+        pc, params, template = entry
+        env = template[:]
+        for slot, value in zip(params, args):
+            env[slot] = value
+
+        return pc, env
 
-        # push env
-        self.env_stack.append(env)
-
-        ret_val = 0
-        # execute until END_FUNC
-        while pc < len(self.tac):
-            op, a1, a2, res = self.tac[pc]
-
-            if op == "END_FUNC":
-                break
-
-            if op == "MOV":
-                val = self.get_val_from_env(env, a1)
-                env[res] = val
-
-            elif op in ("PLUS", "MINUS", "MUL", "DIV", "EQ", "NE", "GT", "LT", "GE", "LE"):
-                left_raw = self.get_val_from_env(env, a1)
-                right_raw = self.get_val_from_env(env, a2)
-
-                if op in ("EQ", "NE"):
-
-                    if isinstance(left_raw, str) or isinstance(right_raw, str):
-                        result = int(str(left_raw) == str(right_raw)) if op == "EQ" else int(str(left_raw) != str(right_raw))
-                    else:
-                        left = self._ensure_int(left_raw, op)
-                        right = self._ensure_int(right_raw, op)
-                        result = int(left == right) if op == "EQ" else int(left != right)
-                else:
-                    left = self._ensure_int(left_raw, op)
-                    right = self._ensure_int(right_raw, op)
-                    if op == "PLUS":
-                        result = left + right
-                    elif op == "MINUS":
-                        result = left - right
-                    elif op == "MUL":
-                        result = left * right
-                    elif op == "DIV":
-                        result = left // right if right != 0 else 0
-                    elif op == "GT":
-                        result = int(left > right)
-                    elif op == "LT":
-                        result = int(left < right)
-                    elif op == "GE":
-                        result = int(left >= right)
-                    elif op == "LE":
-                        result = int(left <= right)
-                env[res] = result
-
-            elif op == "PARAM":
-                val = self.get_val_from_env(env, a1)
-                self.params.append(val)
-
-            elif op == "CALL":
-                argc = int(a2) if a2 is not None else 0
-                args_for_call = []
-
-                if argc:
-                    args_for_call = self.params[-argc:]
-                    del self.params[-argc:]
-
-                nested_ret = self.run_func(a1, args_for_call)
-                env["ret"] = nested_ret
-
-            elif op == "POP":
-                env[res] = env.get("ret", 0)
-
-            elif op == "PRINT":
-                v = self.get_val_from_env(env, a1)
-
-                if isinstance(v, str):
-                    print(v)
-                    self.output.append(v)
-                else:
-                    print(v)
-                    self.output.append(str(v))
-
-            elif op == "IFZ_GOTO":
-                cond = self.get_val_from_env(env, a1)
-                cond_int = self._ensure_int(cond, "IFZ_GOTO")
-
-                if cond_int == 0:
-                    pc = self.labels.get(res, pc)
-                    continue
-
-            elif op == "GOTO":
-                pc = self.labels.get(a1, pc)
+    def run_func(self, func_name, args):
+        # Calls made by the program push the caller's frame and switch to the
+        # callee in this same loop, so TAC recursion never recurses in Python
+        # and its depth is bounded only by memory. A frame is a plain
+        # (resume pc, env, ret slot) tuple, the slot None for a result-less CALL.
+        pc, env = self.enter_func(func_name, args)
+        frames = []
+
+        # hot attributes as locals: LOAD_FAST instead of LOAD_ATTR per step
+        threaded = self.threaded
+        ops = self.ops
+        n = len(threaded)
+        push_frame = frames.append
+        pop_frame = frames.pop
+        # execute until the outermost function returns
+        while pc < n:
+            handler, a1, a2, res = threaded[pc]
+            if handler is not None:
+                pc = handler(env, a1, a2, res, pc)
                 continue
 
-            elif op == "LABEL":
-                pass
+            op = ops[pc]
+            if op == OP_CALL:
+                # enter_func inlined: a1 holds the callee's entry and a2 the
+                # caller's argument slots, copied straight into the callee env
+                if a1 is None:
+                    raise RuntimeError(f"[Runtime] Function '{self.code[pc][1]}' not found")
+                push_frame((pc + 1, env, res))
+                pc, params, template = a1
+                callee = template[:]
+                for slot, src in zip(params, a2):
+                    callee[slot] = env[src]
+                env = callee
+                continue
 
-            elif op == "RET":
-                ret_val = self.get_val_from_env(env, a1)
-                self.env_stack.pop()
-                return ret_val
+            elif op == OP_RET or op == OP_END_FUNC:
+                ret_val = env[a1] if op == OP_RET else 0
+                if not frames:
+                    return ret_val
+
+                self.last_return = ret_val
+                pc, env, ret_slot = pop_frame()
+                if ret_slot is not None:
+                    env[ret_slot] = ret_val
+                continue
 
             pc += 1
 
-        # end function, pop env
-        self.env_stack.pop()
-        return ret_val
+        # ran off the end of the code without END_FUNC
+        return 0
+
+    def get_output_text(self):
+        return "\n".join(map(str, self.output))
 
     def execute(self):
         self.build_indices()
@@ -241,13 +453,12 @@ class TACInterpreter:
             raise RuntimeError("[Runtime] main() not found")
 
         # Call main with no args
-        ret = self.run_func("main", [])
-        self.return_value = ret
+        self.return_value = self.run_func("main", [])
         return self.output, self.return_value
 
 
 # Compiler pipeline + runtime execution 
-def compile_source(filename="test.c"):
+def compile_source(filename="test.c", backend="interp"):
     print("===============================================")
     print("        MINI C COMPILER (Python")
     print("===============================================\n")
@@ -298,13 +509,17 @@ def compile_source(filename="test.c"):
     targetgen = TargetCodeGenerator(opt)
     target = targetgen.generate()
     print("[TARGET CODE]")
-    for line in target:
-        print("   ", line)
+    if target:
+        # one write for the whole listing instead of a print per line
+        print("\n".join(["    " + line for line in target]))
     print("-----------------------------------------------")
 
     # Execute program
     print("[PROGRAM OUTPUT]")
-    vm = TACInterpreter(opt)
+    if backend == "python":
+        vm = TACToPyAst(opt)
+    else:
+        vm = TACInterpreter(opt, codegen.slots, optimizer.labels, optimizer.functions)
     outputs, ret_val = vm.execute()
     print("-----------------------------------------------")
     print(f"Program exited with return value: {ret_val}")
@@ -1,79 +1,119 @@
 # Optimizer for Mini C Compiler
 
+from codegen import FOLD_OPS
+
+
+def _asint(x):
+    # value of an int literal operand (int or numeric string such as "-3"), else None
+    if isinstance(x, int):
+        return x
+    if isinstance(x, str) and (x[1:] if x[:1] == "-" else x).isdecimal():
+        return int(x)
+    return None
+
+def is_temp(name):
+    # codegen temporaries are t1, t2, ...; user variables such as `total`
+    # must not be treated as temps, since temps are reused once released
+    return name[:1] == "t" and name[1:].isdigit()
+
+def _resolve2(a1, a2, temp_map):
+    # substitute mapped temps in both operand fields
+    if isinstance(a1, str):
+        a1 = temp_map.get(a1, a1)
+    if isinstance(a2, str):
+        a2 = temp_map.get(a2, a2)
+    return a1, a2
+
+
+# Ops kept unchanged apart from resolving their operands
+_CTRL_OPS = frozenset({
+    "LABEL", "GOTO", "IFZ_GOTO", "FUNC", "END_FUNC", "PARAM", "CALL", "POP", "PARAM_DECL",
+    "IF_NOT_EQ", "IF_NOT_NE", "IF_NOT_GT", "IF_NOT_LT", "IF_NOT_GE", "IF_NOT_LE",
+})
+_ARITH_OPS = frozenset(FOLD_OPS)
+
+
 class Optimizer:
     def __init__(self, tac):
         self.tac = tac
+        self.labels = {}     # label -> index in the optimized TAC
+        self.functions = {}  # function name -> index of its FUNC instruction
+
+        # op -> handler(op, a1, a2, res, temp_map, out) for the first pass;
+        # ops not listed are copied through unchanged
+        self.handlers = dict.fromkeys(_CTRL_OPS, self._opt_control)
+        self.handlers.update(dict.fromkeys(_ARITH_OPS, self._opt_arith))
+        self.handlers.update({
+            "MOV": self._opt_mov,
+            "RET": self._opt_value,
+            "PRINT": self._opt_value,
+        })
 
     def optimize(self):
         # Keep control-flow ops and structured arithmetic as separate ops
         optimized = []
-        temp_map = {}  
-
-        def resolve(x):
-            return temp_map.get(x, x)
+        temp_map = {}
+        handler_of = self.handlers.get
+        default = self._opt_default
 
         for op, a1, a2, res in self.tac:
-            # keep these ops unchanged (but resolve their args if mapped)
-            if op in ("LABEL", "GOTO", "IFZ_GOTO", "FUNC", "END_FUNC", "PARAM", "CALL", "POP", "PARAM_DECL"):
-                if a1 is not None and isinstance(a1, str):
-                    a1 = resolve(a1)
-                if a2 is not None and isinstance(a2, str):
-                    a2 = resolve(a2)
-                optimized.append((op, a1, a2, res))
-                continue
+            handler_of(op, default)(op, a1, a2, res, temp_map, optimized)
 
-            if op == "MOV":
-                src = resolve(a1) if isinstance(a1, str) else a1
-                if res and res.startswith("t"):
-                    # map temp to src (keep structured)
-                    temp_map[res] = src
-                else:
-                    optimized.append(("MOV", src, None, res))
-                continue
-
-            if op in ("PLUS", "MINUS", "MUL", "DIV", "EQ", "NE", "GT", "LT", "GE", "LE"):
-                left = resolve(a1) if isinstance(a1, str) else a1
-                right = resolve(a2) if isinstance(a2, str) else a2
-                # constant folding
-                if isinstance(left, str) and left.isdigit() and isinstance(right, str) and right.isdigit():
-                    # safely compute numeric result
-                    sym = self.symbol(op)
-                    folded = str(eval(f"{left}{sym}{right}"))
-                    if res and res.startswith("t"):
-                        temp_map[res] = folded
-                    else:
-                        optimized.append(("MOV", folded, None, res))
-                else:
-                    optimized.append((op, left, right, res))
-                continue
-
-            if op == "RET":
-                v = resolve(a1) if isinstance(a1, str) else a1
-                optimized.append(("RET", v, None, None))
-                continue
-
-            if op == "PRINT":
-                v = resolve(a1) if isinstance(a1, str) else a1
-                optimized.append(("PRINT", v, None, None))
-                continue
-
-            # fallback
-            optimized.append((op, a1, a2, res))
-
-        # Second pass: replace MOV temp->var where temp mapped to expression
+        # Second pass: replace MOV temp->var where temp mapped to expression,
+        # dropping MOVs that copy a value onto itself, and indexing labels and
+        # functions of the final code on the way
         final = []
         for op, a1, a2, res in optimized:
-            if op == "MOV" and isinstance(a1, str) and a1 in temp_map:
-                final.append(("MOV", temp_map[a1], None, res))
-            else:
-                final.append((op, a1, a2, res))
+            if op == "LABEL":
+                self.labels[a1] = len(final)
+            elif op == "FUNC":
+                self.functions[a1] = len(final)
+            if op == "MOV":
+                if isinstance(a1, str) and a1 in temp_map:
+                    a1 = temp_map[a1]
+                if a1 == res:
+                    continue
+            final.append((op, a1, a2, res))
         return final
 
-    def symbol(self, op):
-        return {
-            "PLUS": "+", "MINUS": "-", "MUL": "*", "DIV": "/",
-            "EQ": "==", "NE": "!=", "GT": ">", "LT": "<", "GE": ">=", "LE": "<="
-        }[op]
+    # First-pass handlers
+    def _opt_control(self, op, a1, a2, res, temp_map, out):
+        # keep the op, resolving its args if mapped
+        a1, a2 = _resolve2(a1, a2, temp_map)
+        temp_map.pop(res, None)  # pooled temp redefined by CALL/POP
+        out.append((op, a1, a2, res))
+
+    def _opt_mov(self, op, a1, a2, res, temp_map, out):
+        src = temp_map.get(a1, a1) if isinstance(a1, str) else a1
+        if res and is_temp(res):
+            # map temp to src (keep structured)
+            temp_map[res] = src
+        else:
+            out.append(("MOV", src, None, res))
+
+    def _opt_arith(self, op, a1, a2, res, temp_map, out):
+        left, right = _resolve2(a1, a2, temp_map)
+        # constant folding to a native int, with the interpreter's operator table;
+        # codegen emits literals as ints, so only hand-written TAC needs parsing
+        li = left if type(left) is int else _asint(left)
+        ri = right if type(right) is int else _asint(right)
+        if li is not None and ri is not None:
+            folded = FOLD_OPS[op](li, ri)
+            if res and is_temp(res):
+                temp_map[res] = folded
+            else:
+                out.append(("MOV", folded, None, res))
+        else:
+            temp_map.pop(res, None)
+            out.append((op, left, right, res))
+
+    def _opt_value(self, op, a1, a2, res, temp_map, out):
+        # RET / PRINT
+        v = temp_map.get(a1, a1) if isinstance(a1, str) else a1
+        out.append((op, v, None, None))
+
+    def _opt_default(self, op, a1, a2, res, temp_map, out):
+        out.append((op, a1, a2, res))
 
 
 
@@ -3,65 +3,87 @@
 from lexical import Token, tokenize
 
 # AST Node Definitions
-class ASTNode: pass
+class ASTNode:
+    __slots__ = ()
 
 class Program(ASTNode):
+    __slots__ = ("functions",)
     def __init__(self, functions): self.functions = functions
 
 class Function(ASTNode):
+    __slots__ = ("name", "params", "body")
     def __init__(self, name, params, body):
         self.name, self.params, self.body = name, params, body
 
 class Declaration(ASTNode):
+    __slots__ = ("var_name", "value")
     def __init__(self, var_name, value): self.var_name, self.value = var_name, value
 
 class Assignment(ASTNode):
+    __slots__ = ("var_name", "value")
     def __init__(self, var_name, value): self.var_name, self.value = var_name, value
 
 class Return(ASTNode):
+    __slots__ = ("value",)
     def __init__(self, value): self.value = value
 
 class BinOp(ASTNode):
+    __slots__ = ("left", "op", "right")
     def __init__(self, left, op, right): self.left, self.op, self.right = left, op, right
 
 class Number(ASTNode):
+    __slots__ = ("value",)
     def __init__(self, value): self.value = int(value)
 
-class String(ASTNode):                
+class String(ASTNode):
+    __slots__ = ("value",)
     def __init__(self, value):
         self.value = value.strip('"')
 
 class Var(ASTNode):
+    __slots__ = ("name",)
     def __init__(self, name): self.name = name
 
 class Print(ASTNode):
+    __slots__ = ("value",)
     def __init__(self, value): self.value = value
 
 class If(ASTNode):
+    __slots__ = ("condition", "then_body", "else_body")
     def __init__(self, condition, then_body, else_body=None):
         self.condition, self.then_body, self.else_body = condition, then_body, else_body
 
 class While(ASTNode):
+    __slots__ = ("condition", "body")
     def __init__(self, condition, body): self.condition, self.body = condition, body
 
 class FuncCall(ASTNode):
+    __slots__ = ("name", "args")
     def __init__(self, name, args): self.name, self.args = name, args
 
 
 # Parser
+_RELATIONAL_OPS = frozenset(("EQ", "NE", "GT", "LT", "GE", "LE"))
+_ADDITIVE_OPS = frozenset(("PLUS", "MINUS"))
+_TERM_OPS = frozenset(("MUL", "DIV"))
+
 class Parser:
     def __init__(self, tokens):
+        # tokens end with an EOF sentinel (tokenize() always appends one) and
+        # parsing never consumes it, so reads at self.pos need no bounds check
+        if not tokens or tokens[-1].type != "EOF":
+            tokens = list(tokens) + [Token("EOF", "", 0, 0)]
         self.tokens, self.pos = tokens, 0
 
     def current_token(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else Token("EOF", "", 0, 0)
+        return self.tokens[self.pos]
 
     def peek(self, offset=1):
         i = self.pos + offset
         return self.tokens[i] if i < len(self.tokens) else Token("EOF", "", 0, 0)
 
     def eat(self, token_type=None):
-        tok = self.current_token()
+        tok = self.tokens[self.pos]
         if token_type and tok.type != token_type:
             self.error(f"Expected {token_type}, found {tok.type}")
         self.pos += 1
@@ -73,7 +95,7 @@ class Parser:
 
     def parse(self):
         functions = []
-        while self.current_token().type != "EOF":
+        while self.tokens[self.pos].type != "EOF":
             functions.append(self.function())
         return Program(functions)
 
@@ -82,23 +104,23 @@ class Parser:
         name = self.eat("ID").value
         self.eat("LPAREN")
         params = []
-        if self.current_token().type != "RPAREN":
+        if self.tokens[self.pos].type != "RPAREN":
             while True:
-                if self.current_token().type == "INT": self.eat("INT")
+                if self.tokens[self.pos].type == "INT": self.eat("INT")
                 params.append(self.eat("ID").value)
-                if self.current_token().type == "COMMA":
+                if self.tokens[self.pos].type == "COMMA":
                     self.eat("COMMA"); continue
                 break
         self.eat("RPAREN")
         self.eat("LBRACE")
         body = []
-        while self.current_token().type != "RBRACE":
+        while self.tokens[self.pos].type != "RBRACE":
             body.append(self.statement())
         self.eat("RBRACE")
         return Function(name, params, body)
 
     def statement(self):
-        t = self.current_token().type
+        t = self.tokens[self.pos].type
         if t == "INT": return self.declaration()
         elif t == "ID" and self.peek().type == "LPAREN":
             node = self.func_call(); self.eat("SEMI"); return node
@@ -112,7 +134,7 @@ class Parser:
     def declaration(self):
         self.eat("INT"); name = self.eat("ID").value
         val = None
-        if self.current_token().type == "ASSIGN":
+        if self.tokens[self.pos].type == "ASSIGN":
             self.eat("ASSIGN"); val = self.expression()
         self.eat("SEMI"); return Declaration(name, val)
 
@@ -133,18 +155,18 @@ class Parser:
         cond = self.expression(); self.eat("RPAREN")
         self.eat("LBRACE")
         then_b = []
-        while self.current_token().type != "RBRACE":
+        while self.tokens[self.pos].type != "RBRACE":
             then_b.append(self.statement())
         self.eat("RBRACE")
 
         else_b = None
-        if self.current_token().type == "ELSE":
+        if self.tokens[self.pos].type == "ELSE":
             self.eat("ELSE")
-            if self.current_token().type == "IF":
+            if self.tokens[self.pos].type == "IF":
                 else_b = [self.if_stmt()]
             else:
                 self.eat("LBRACE"); else_b = []
-                while self.current_token().type != "RBRACE":
+                while self.tokens[self.pos].type != "RBRACE":
                     else_b.append(self.statement())
                 self.eat("RBRACE")
         return If(cond, then_b, else_b)
@@ -153,17 +175,17 @@ class Parser:
         self.eat("WHILE"); self.eat("LPAREN")
         cond = self.expression(); self.eat("RPAREN")
         self.eat("LBRACE"); body = []
-        while self.current_token().type != "RBRACE":
+        while self.tokens[self.pos].type != "RBRACE":
             body.append(self.statement())
         self.eat("RBRACE"); return While(cond, body)
 
     def func_call(self):
         name = self.eat("ID").value; self.eat("LPAREN")
         args = []
-        if self.current_token().type != "RPAREN":
+        if self.tokens[self.pos].type != "RPAREN":
             while True:
                 args.append(self.expression())
-                if self.current_token().type == "COMMA":
+                if self.tokens[self.pos].type == "COMMA":
                     self.eat("COMMA"); continue
                 break
         self.eat("RPAREN"); return FuncCall(name, args)
@@ -172,101 +194,109 @@ class Parser:
 
     def relational(self):
         n = self.additive()
-        while self.current_token().type in ("EQ","NE","GT","LT","GE","LE"):
-            op = self.eat().type; r = self.additive(); n = BinOp(n, op, r)
+        tokens = self.tokens
+        while tokens[self.pos].type in _RELATIONAL_OPS:
+            op = tokens[self.pos].type; self.pos += 1
+            n = BinOp(n, op, self.additive())
         return n
 
     def additive(self):
         n = self.term()
-        while self.current_token().type in ("PLUS","MINUS"):
-            op = self.eat().type; r = self.term(); n = BinOp(n, op, r)
+        tokens = self.tokens
+        while tokens[self.pos].type in _ADDITIVE_OPS:
+            op = tokens[self.pos].type; self.pos += 1
+            n = BinOp(n, op, self.term())
         return n
 
     def term(self):
         n = self.factor()
-        while self.current_token().type in ("MUL","DIV"):
-            op = self.eat().type; r = self.factor(); n = BinOp(n, op, r)
+        tokens = self.tokens
+        while tokens[self.pos].type in _TERM_OPS:
+            op = tokens[self.pos].type; self.pos += 1
+            n = BinOp(n, op, self.factor())
         return n
 
     def factor(self):
-        tok = self.current_token()
-        if tok.type == "NUMBER":
-            self.eat("NUMBER"); return Number(tok.value)
-        elif tok.type == "STRING":                    # <-- NEW
-            self.eat("STRING"); return String(tok.value)
-        elif tok.type == "ID":
-            if self.peek().type == "LPAREN": return self.func_call()
-            self.eat("ID"); return Var(tok.value)
-        elif tok.type == "LPAREN":
-            self.eat("LPAREN"); node = self.expression(); self.eat("RPAREN"); return node
+        tok = self.tokens[self.pos]
+        t = tok.type
+        if t == "NUMBER":
+            self.pos += 1; return Number(tok.value)
+        elif t == "STRING":                    # <-- NEW
+            self.pos += 1; return String(tok.value)
+        elif t == "ID":
+            if self.tokens[self.pos + 1].type == "LPAREN": return self.func_call()
+            self.pos += 1; return Var(tok.value)
+        elif t == "LPAREN":
+            self.pos += 1; node = self.expression(); self.eat("RPAREN"); return node
         else:
-            self.error(f"Unexpected token {tok.type} in expression")
+            self.error(f"Unexpected token {t} in expression")
 
 # Printer for AST
+_OP_SYMBOLS = {
+    "PLUS": "+", "MINUS": "-", "MUL": "*", "DIV": "/",
+    "EQ": "==", "NE": "!=", "GT": ">", "LT": "<", "GE": ">=", "LE": "<="
+}
+
 def op_symbol(op):
-    return {
-        "PLUS": "+", "MINUS": "-", "MUL": "*", "DIV": "/",
-        "EQ": "==", "NE": "!=", "GT": ">", "LT": "<", "GE": ">=", "LE": "<="
-    }.get(op, op)
+    return _OP_SYMBOLS.get(op, op)
 
 
 def pretty_print_ast(node, indent="", is_last=True):
-    from parser import Program, Declaration, Assignment, Return, Print, If, While, BinOp, Var, Number, FuncCall
-    out = ""
+    # Statements append to one shared parts list (joined once, linear in the
+    # tree size); expressions are short strings built by _pp_expr
+    parts = []
+    _pp(node, parts, indent)
+    return "".join(parts)
+
+
+def _pp_body(body, parts, indent, last_closes=True):
+    for i, stmt in enumerate(body):
+        last = last_closes and i == len(body) - 1
+        parts.append(indent + ("└── " if last else "├── "))
+        _pp(stmt, parts, indent + ("    " if last else "│   "))
+
+
+def _pp(node, parts, indent):
+    from parser import Program, Declaration, Assignment, Return, Print, If, While
 
     if isinstance(node, Program):
-        for i, func in enumerate(node.functions):
-            out += f"Program({func.name})\n"
-            for j, stmt in enumerate(func.body):
-                last = (j == len(func.body) - 1)
-                branch = "└── " if last else "├── "
-                out += indent + branch + pretty_print_ast(stmt, indent + ("    " if last else "│   "), is_last=last)
-        return out
-
-    if isinstance(node, Declaration):
-        val = pretty_print_ast(node.value, indent + "    ", True).strip() if node.value else "None"
-        return f"VarDecl({node.var_name}, {val})\n"
-
-    if isinstance(node, Assignment):
-        val = pretty_print_ast(node.value, indent + "    ", True).strip()
-        return f"Assign({node.var_name}, {val})\n"
-
-    if isinstance(node, Return):
-        val = pretty_print_ast(node.value, indent + "    ", True).strip()
-        return f"Return({val})\n"
-
-    if isinstance(node, Print):
-        val = pretty_print_ast(node.value, indent + "    ", True).strip()
-        return f"Print({val})\n"
-
-    if isinstance(node, If):
-        cond = pretty_print_ast(node.condition, indent + "    ", True).strip()
-        s = f"If({cond})\n"
-        for i, stmt in enumerate(node.then_body):
-            last = (i == len(node.then_body) - 1 and not node.else_body)
-            branch = "└── " if last else "├── "
-            s += indent + branch + pretty_print_ast(stmt, indent + ("    " if last else "│   "), is_last=last)
+        for func in node.functions:
+            parts.append(f"Program({func.name})\n")
+            _pp_body(func.body, parts, indent)
+
+    elif isinstance(node, Declaration):
+        val = _pp_expr(node.value) if node.value else "None"
+        parts.append(f"VarDecl({node.var_name}, {val})\n")
+
+    elif isinstance(node, Assignment):
+        parts.append(f"Assign({node.var_name}, {_pp_expr(node.value)})\n")
+
+    elif isinstance(node, Return):
+        parts.append(f"Return({_pp_expr(node.value)})\n")
+
+    elif isinstance(node, Print):
+        parts.append(f"Print({_pp_expr(node.value)})\n")
+
+    elif isinstance(node, If):
+        parts.append(f"If({_pp_expr(node.condition)})\n")
+        _pp_body(node.then_body, parts, indent, last_closes=not node.else_body)
         if node.else_body:
-            s += indent + "├── Else\n"
-            for i, stmt in enumerate(node.else_body):
-                last = (i == len(node.else_body) - 1)
-                branch = "└── " if last else "├── "
-                s += indent + branch + pretty_print_ast(stmt, indent + ("    " if last else "│   "), is_last=last)
-        return s
-
-    if isinstance(node, While):
-        cond = pretty_print_ast(node.condition, indent + "    ", True).strip()
-        s = f"While({cond})\n"
-        for i, stmt in enumerate(node.body):
-            last = (i == len(node.body) - 1)
-            branch = "└── " if last else "├── "
-            s += indent + branch + pretty_print_ast(stmt, indent + ("    " if last else "│   "), is_last=last)
-        return s
+            parts.append(indent + "├── Else\n")
+            _pp_body(node.else_body, parts, indent)
+
+    elif isinstance(node, While):
+        parts.append(f"While({_pp_expr(node.condition)})\n")
+        _pp_body(node.body, parts, indent)
+
+    else:
+        parts.append(_pp_expr(node))
+
+
+def _pp_expr(node):
+    from parser import BinOp, Var, Number, FuncCall
 
     if isinstance(node, BinOp):
-        left = pretty_print_ast(node.left, indent + "    ", False).strip()
-        right = pretty_print_ast(node.right, indent + "    ", True).strip()
-        return f"({left} {op_symbol(node.op)} {right})"
+        return f"({_pp_expr(node.left)} {op_symbol(node.op)} {_pp_expr(node.right)})"
 
     if isinstance(node, Var):
         return node.name
@@ -275,7 +305,7 @@ def pretty_print_ast(node, indent="", is_last=True):
         return str(node.value)
 
     if isinstance(node, FuncCall):
-        args = ", ".join(pretty_print_ast(a, indent + "    ", True).strip() for a in node.args)
+        args = ", ".join(_pp_expr(a) for a in node.args)
         return f"{node.name}({args})"
 
     return str(node)
@@ -0,0 +1,282 @@
+# pygen.py
+# Python Backend for Mini C Compiler: TAC -> Python AST -> CPython bytecode
+#
+# Every TAC function becomes a Python function built from ast nodes, compiled
+# with compile() and run by CPython's own eval loop instead of being
+# interpreted instruction by instruction. Jumps are lowered to basic blocks
+# selected by a `pc` variable inside a `while True` loop.
+
+import ast
+
+from codegen import FOLD_OPS, BRANCH_IF_NOT
+
+_ARITH_OPS = {"PLUS": ast.Add, "MINUS": ast.Sub, "MUL": ast.Mult, "DIV": ast.FloorDiv}
+_CMP_OPS = {"EQ": ast.Eq, "NE": ast.NotEq, "GT": ast.Gt, "LT": ast.Lt, "GE": ast.GtE, "LE": ast.LtE}
+# IF_NOT_<cmp> -> (comparison, its negation as an ast operator)
+_IF_NOT_OPS = {BRANCH_IF_NOT[cmp]: (cmp, neg) for cmp, neg in (
+    ("EQ", ast.NotEq), ("NE", ast.Eq), ("GT", ast.LtE), ("LT", ast.GtE), ("GE", ast.Lt), ("LE", ast.Gt))}
+_BLOCK_END_OPS = ("GOTO", "IFZ_GOTO", "RET") + tuple(_IF_NOT_OPS)
+
+
+# Runtime helpers for values that may be strings (same rules as TACInterpreter)
+def _as_int(v, op_name):
+    if isinstance(v, str):
+        try:
+            return int(v)
+        except ValueError:
+            raise RuntimeError(f"[Runtime] Cannot use string value '{v}' in numeric operation '{op_name}'")
+    return v
+
+def _binop(op, left, right):
+    if isinstance(left, str) or isinstance(right, str):
+        if op in ("EQ", "NE"):
+            left, right = str(left), str(right)
+        else:
+            left, right = _as_int(left, op), _as_int(right, op)
+    return FOLD_OPS[op](left, right)
+
+def _missing_function(name):
+    def call(*args):
+        raise RuntimeError(f"[Runtime] Function '{name}' not found")
+    return call
+
+
+def _is_string_literal(v):
+    return isinstance(v, str) and len(v) >= 2 and v[0] == '"' and v[-1] == '"'
+
+def _load(name):
+    return ast.Name(id=name, ctx=ast.Load())
+
+def _store(name):
+    return ast.Name(id=name, ctx=ast.Store())
+
+def _assign(name, value):
+    return ast.Assign(targets=[_store(name)], value=value)
+
+def _call(func, *args):
+    return ast.Call(func=_load(func), args=list(args), keywords=[])
+
+def _is_zero(expr):
+    return ast.Compare(left=expr, ops=[ast.Eq()], comparators=[ast.Constant(0)])
+
+
+class TACToPyAst:
+    def __init__(self, tac):
+        self.tac = tac
+        self.functions = {}   # func name -> (params, instructions with folded CALL args)
+        self.namespace = None # globals of the compiled module
+        self.output = []      # printed values as they were, stringified by get_output_text
+        self.return_value = 0
+
+    # Split the TAC into functions; PARAM runs are folded into the CALL that
+    # consumes them as (op, name, args tuple, res)
+    def collect_functions(self):
+        name, params, body, pending = None, [], [], []
+        for op, a1, a2, res in self.tac:
+            if op == "FUNC":
+                name, params, body, pending = a1, [], [], []
+            elif op == "PARAM_DECL":
+                params.append(a1)
+            elif op == "END_FUNC":
+                self.functions[name] = (params, body)
+            elif op == "PARAM":
+                pending.append(a1)
+            elif op == "CALL":
+                base = max(len(pending) - (int(a2) if a2 is not None else 0), 0)
+                body.append((op, a1, tuple(pending[base:]), res))
+                del pending[base:]
+            else:
+                body.append((op, a1, a2, res))
+
+    # Whole-program, flow-insensitive search for names that may hold a string.
+    # Operations on those go through the _binop/_as_int helpers; everything
+    # else compiles to plain Python int arithmetic.
+    def string_names(self):
+        strings = {name: set() for name in self.functions}
+        returns_string = set()
+
+        def maybe_str(v, names):
+            return _is_string_literal(v) or (isinstance(v, str) and v in names)
+
+        changed = True
+        while changed:
+            changed = False
+            for fname, (params, body) in self.functions.items():
+                names = strings[fname]
+                before = (len(names), len(returns_string))
+                for op, a1, a2, res in body:
+                    if op == "MOV" and maybe_str(a1, names):
+                        names.add(res)
+                    elif op == "CALL":
+                        if a1 in returns_string and res:
+                            names.add(res)
+                        callee = self.functions.get(a1)
+                        if callee:
+                            for p, arg in zip(callee[0], a2):
+                                if maybe_str(arg, names) and p not in strings[a1]:
+                                    strings[a1].add(p)
+                                    changed = True
+                    elif op == "POP" and returns_string:
+                        names.add(res)
+                    elif op == "RET" and maybe_str(a1, names):
+                        returns_string.add(fname)
+                if (len(names), len(returns_string)) != before:
+                    changed = True
+        return strings
+
+    def operand(self, v):
+        if v is None:
+            return ast.Constant(0)
+        if isinstance(v, int):
+            return ast.Constant(v)
+        if _is_string_literal(v):
+            return ast.Constant(v[1:-1])
+        if v.lstrip("-").isdigit():
+            return ast.Constant(int(v))
+        return _load("v_" + v)
+
+    def binop_expr(self, op, a1, a2, may_be_str):
+        left, right = self.operand(a1), self.operand(a2)
+        if may_be_str:
+            return _call("_binop", ast.Constant(op), left, right)
+        if op == "DIV":
+            return ast.IfExp(
+                test=ast.Compare(left=right, ops=[ast.NotEq()], comparators=[ast.Constant(0)]),
+                body=ast.BinOp(left=left, op=ast.FloorDiv(), right=right),
+                orelse=ast.Constant(0))
+        if op in _ARITH_OPS:
+            return ast.BinOp(left=left, op=_ARITH_OPS[op](), right=right)
+        return ast.IfExp(
+            test=ast.Compare(left=left, ops=[_CMP_OPS[op]()], comparators=[right]),
+            body=ast.Constant(1), orelse=ast.Constant(0))
+
+    def jump(self, target):
+        return [_assign("pc", ast.Constant(target)), ast.Continue()]
+
+    def translate_function(self, fname, strings):
+        params, body = self.functions[fname]
+        names = strings[fname]
+
+        def maybe_str(v):
+            return _is_string_literal(v) or (isinstance(v, str) and v in names)
+
+        # Basic blocks: a block starts at each LABEL and after each jump
+        blocks, block_of = [[]], {}
+        for instr in body:
+            if instr[0] == "LABEL":
+                if blocks[-1]:
+                    blocks.append([])
+                block_of[instr[1]] = len(blocks) - 1
+            else:
+                blocks[-1].append(instr)
+                if instr[0] in _BLOCK_END_OPS:
+                    blocks.append([])
+
+        local_names = set()
+        stmts_per_block = []
+        for i, block in enumerate(blocks):
+            stmts = []
+            for op, a1, a2, res in block:
+                if op == "CALL":
+                    operands = a2 + (res,)
+                else:
+                    operands = () if op == "GOTO" else (a1, a2) if op in _IF_NOT_OPS \
+                        else (a1,) if op in _BLOCK_END_OPS else (a1, a2, res)
+                local_names.update(x for x in operands if self.is_var(x))
+                if op == "MOV":
+                    stmts.append(_assign("v_" + res, self.operand(a1)))
+                elif op in FOLD_OPS:
+                    expr = self.binop_expr(op, a1, a2, maybe_str(a1) or maybe_str(a2))
+                    stmts.append(_assign("v_" + res, expr))
+                elif op == "PRINT" or op == "PRINT_STR":
+                    stmts.append(ast.Expr(_call("_print", self.operand(a1))))
+                elif op == "CALL":
+                    call = _call("f_" + a1, *(self.operand(a) for a in a2))
+                    stmts.append(_assign("v_" + res if res else "_ret", call))
+                elif op == "POP":
+                    stmts.append(_assign("v_" + res, _load("_ret")))
+                elif op == "RET":
+                    stmts.append(ast.Return(self.operand(a1)))
+                elif op == "GOTO":
+                    stmts.extend(self.jump(block_of[a1]))
+                elif op == "IFZ_GOTO":
+                    cond = self.operand(a1)
+                    if maybe_str(a1):
+                        cond = _call("_as_int", cond, ast.Constant("IFZ_GOTO"))
+                    stmts.append(ast.If(test=_is_zero(cond), body=self.jump(block_of[res]), orelse=[]))
+                elif op in _IF_NOT_OPS:
+                    cmp, negated = _IF_NOT_OPS[op]
+                    if maybe_str(a1) or maybe_str(a2):
+                        test = _is_zero(self.binop_expr(cmp, a1, a2, True))
+                    else:
+                        test = ast.Compare(left=self.operand(a1), ops=[negated()], comparators=[self.operand(a2)])
+                    stmts.append(ast.If(test=test, body=self.jump(block_of[res]), orelse=[]))
+            if not block or block[-1][0] not in ("GOTO", "RET"):
+                stmts.extend(self.jump(i + 1) if i + 1 < len(blocks) else [ast.Return(ast.Constant(0))])
+            stmts_per_block.append(stmts)
+
+        # Binary search over block numbers selects the block to run
+        def dispatch(lo, hi):
+            if hi - lo == 1:
+                return stmts_per_block[lo]
+            mid = (lo + hi) // 2
+            return [ast.If(test=ast.Compare(left=_load("pc"), ops=[ast.Lt()], comparators=[ast.Constant(mid)]),
+                           body=dispatch(lo, mid), orelse=dispatch(mid, hi))]
+
+        if len(blocks) == 1:
+            fn_body = stmts_per_block[0]
+        else:
+            fn_body = [_assign("pc", ast.Constant(0)),
+                       ast.While(test=ast.Constant(True), body=dispatch(0, len(blocks)), orelse=[])]
+
+        # Every local starts at 0 like an interpreter env slot; missing
+        # arguments default to 0 and extra ones are ignored
+        prologue = [_assign("v_" + n, ast.Constant(0)) for n in sorted(local_names - set(params))]
+        prologue.append(_assign("_ret", ast.Constant(0)))
+        args = ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg="v_" + p) for p in params],
+            vararg=ast.arg(arg="_extra"), kwonlyargs=[], kw_defaults=[], kwarg=None,
+            defaults=[ast.Constant(0) for _ in params])
+        fields = {}
+        if "type_params" in ast.FunctionDef._fields:
+            fields["type_params"] = []
+        return ast.FunctionDef(name="f_" + fname, args=args, body=prologue + fn_body,
+                               decorator_list=[], returns=None, **fields)
+
+    def is_var(self, v):
+        return isinstance(v, str) and not _is_string_literal(v) and not v.lstrip("-").isdigit()
+
+    def compile(self):
+        self.collect_functions()
+        strings = self.string_names()
+        module = ast.Module(body=[self.translate_function(f, strings) for f in self.functions], type_ignores=[])
+        ast.fix_missing_locations(module)
+        code = compile(module, "<tac>", "exec")
+
+        self.namespace = {"_binop": _binop, "_as_int": _as_int, "_print": self._print}
+        for _, body in self.functions.values():
+            for op, a1, _, _ in body:
+                if op == "CALL" and a1 not in self.functions:
+                    self.namespace["f_" + a1] = _missing_function(a1)
+        exec(code, self.namespace)
+
+    def _print(self, v):
+        print(v)
+        self.output.append(v)
+
+    def get_output_text(self):
+        return "\n".join(map(str, self.output))
+
+    def execute(self):
+        if self.namespace is None:
+            self.compile()
+
+        if "main" not in self.functions:
+            raise RuntimeError("[Runtime] main() not found")
+
+        # Calls between compiled functions are Python calls
+        try:
+            self.return_value = self.namespace["f_main"]()
+        except RecursionError:
+            raise RuntimeError("[Runtime] Call depth exceeds Python's recursion limit")
+        return self.output, self.return_value
@@ -1,161 +1,377 @@
 # targetgen.py
 # Target Code Generator for our Mini C Compiler (Python Version)
 
-from typing import List, Tuple, Optional
+from collections import Counter
+from operator import itemgetter
+from typing import Callable, ClassVar, Dict, List, Tuple, Optional
+
+from optimizer import is_temp
 
 TACInstr = Tuple[str, Optional[str], Optional[str], Optional[str]]
 
+_ARITH_OPS = ("PLUS", "MINUS", "MUL", "DIV", "EQ", "NE", "GT", "LT", "GE", "LE")
+# Ops that emit no code; they are filtered out before lowering
+_NOOP_OPS = frozenset(("PARAM_DECL", "END_FUNC"))
+# Ops without side effects: a store no one reads can be dropped, and they
+# may compute a while loop's test ahead of its branch
+_PURE_OPS = frozenset(_ARITH_OPS + ("MOV",))
+
+_ZERO = (0, "0")
+_ONE = (1, "1")
+
+def _identity(op, a1, a2):
+    # x+0, 0+x, x-0, x*1, 1*x, x/1 -> ("MOV", x); x*0, 0*x -> ("MOV", 0);
+    # 0-x -> ("NEG", x); None when no identity applies
+    if op == "PLUS":
+        if a2 in _ZERO:
+            return "MOV", a1
+        if a1 in _ZERO:
+            return "MOV", a2
+    elif op == "MINUS":
+        if a2 in _ZERO:
+            return "MOV", a1
+        if a1 in _ZERO:
+            return "NEG", a2
+    elif op == "MUL":
+        if a1 in _ZERO or a2 in _ZERO:
+            return "MOV", 0
+        if a2 in _ONE:
+            return "MOV", a1
+        if a1 in _ONE:
+            return "MOV", a2
+    elif op == "DIV":
+        if a2 in _ONE:
+            return "MOV", a1
+    return None
+
 class TargetCodeGenerator:
+    # TAC op -> assembly mnemonic, built once for the class
+    _OPMAP: ClassVar[Dict[str, str]] = {
+        "PLUS": "ADD", "MINUS": "SUB", "MUL": "MUL", "DIV": "DIV",
+        "EQ": "EQ", "NE": "NE", "GT": "GT", "LT": "LT", "GE": "GE", "LE": "LE"
+    }
+    # binop -> its three-address line with the mnemonic filled in, formatted
+    # with (dest, left, right)
+    _ARITH_TEMPLATES: ClassVar[Dict[str, str]] = {
+        op: asm + " %s, %s, %s" for op, asm in _OPMAP.items()
+    }
+    # IF_NOT_<cmp> -> jump taken when the comparison is false
+    _JUMP_IF_NOT: ClassVar[Dict[str, str]] = {
+        "IF_NOT_EQ": "JNE", "IF_NOT_NE": "JE", "IF_NOT_GT": "JLE",
+        "IF_NOT_LT": "JGE", "IF_NOT_GE": "JL", "IF_NOT_LE": "JG"
+    }
+    # IF_NOT_<cmp> -> jump taken when the comparison is true
+    _JUMP_IF: ClassVar[Dict[str, str]] = {
+        "IF_NOT_EQ": "JE", "IF_NOT_NE": "JNE", "IF_NOT_GT": "JG",
+        "IF_NOT_LT": "JL", "IF_NOT_GE": "JGE", "IF_NOT_LE": "JLE"
+    }
+    # comparison -> jump taken when it is false, for a compare feeding IFZ_GOTO
+    _JUMP_IF_FALSE: ClassVar[Dict[str, str]] = {
+        "EQ": "JNE", "NE": "JE", "GT": "JLE", "LT": "JGE", "GE": "JL", "LE": "JG"
+    }
+
     def __init__(self, optimized_tac: List[TACInstr]):
         self.optimized_tac = optimized_tac
+        self.tac: List[TACInstr] = []  # optimized_tac without the rows that emit nothing
         self.target_code: List[str] = []
+        # bound once: one attribute load per emitted line instead of two
+        self.emit = self.target_code.append
+        self.emitx = self.target_code.extend
+        self.use_count: Dict[object, int] = Counter()  # name -> number of operand reads in the TAC
+        self.label_index: Dict[str, int] = {}   # label -> index of its LABEL row (None if repeated)
+        self.loop_stop = 0  # end of the loop body being lowered; nested loops must close before it
+        self.label_alias: Dict[str, str] = {}  # label -> label it shares a position with
+        self.temp_names: set = set()            # result names that are temps
+        self.read_by_next: set = set()          # rows whose temp result only the next row reads
+        self.dead_stores: set = set()           # result names written but never read
+        self.call_nargs: Dict[int, object] = {}  # CALL row index -> argument count, 0 if absent
+
+        # op -> handler(op, a1, a2, res, i) emitting the instruction at i and
+        # returning the index of the next one to lower
+        self._dispatch: Dict[str, Callable[..., int]] = {op: self._arith_emitter(op) for op in _ARITH_OPS}
+        self._dispatch.update(dict.fromkeys(self._JUMP_IF_NOT, self._emit_if_not))
+        self._dispatch.update({
+            "FUNC": self._emit_func,
+            "IFZ_GOTO": self._emit_ifz_goto,
+            "GOTO": self._emit_goto,
+            "LABEL": self._emit_label,
+            "MOV": self._emit_mov,
+            "PRINT": self._emit_print,
+            "PRINT_STR": self._emit_print,
+            "RET": self._emit_ret,
+            "PARAM": self._emit_param,
+            "CALL": self._emit_call,
+            "POP": self._emit_pop,
+        })
 
     def opmap(self, op: str) -> str:
-        return {
-            "PLUS": "ADD", "MINUS": "SUB", "MUL": "MUL", "DIV": "DIV",
-            "EQ": "EQ", "NE": "NE", "GT": "GT", "LT": "LT", "GE": "GE", "LE": "LE"
-        }.get(op, op)
+        return self._OPMAP.get(op, op)
 
     def generate(self) -> List[str]:
-        i = 0
-        n = len(self.optimized_tac)
-        while i < n:
-            op, a1, a2, res = self.optimized_tac[i]
-
-            # Function label
-            if op == "FUNC":
-
-                if a1:
-                    self.target_code.append(f"{a1}:")
-                else:
-                    self.target_code.append("FUNC:")
-                i += 1
-                continue
-
-            if op == "END_FUNC":
-                i += 1
-                continue
-
-            # Arithmetic producing a temp followed by MOV temp -> var
-            if op in ("PLUS", "MINUS", "MUL", "DIV", "EQ", "NE", "GT", "LT", "GE", "LE") and res and res.startswith("t"):
-
-                if i + 1 < n:
-                    nop, na1, na2, nres = self.optimized_tac[i+1]
-                    if nop == "MOV" and na1 == res and nres:
-                        asm = self.opmap(op)
-                        left = a1
-                        right = a2
-                        dest = nres
-
-                        if left == dest:
-                            self.target_code.append(f"{asm} {left}, {right}")
-                            i += 2
-                            continue
-                        else:
-                            self.target_code.append(f"{asm} {left}, {right}")
-                            if dest != left:
-                                self.target_code.append(f"MOV {dest}, {left}")
-                            i += 2
-                            continue
-
-                # No matching MOV next -> fallback: emit op to temp
-                asm = self.opmap(op)
-                self.target_code.append(f"{asm} {res}, {a1}, {a2}")
-                i += 1
-                continue
-
-            # IFZ_GOTO -> CMP/JE sequence
-            if op == "IFZ_GOTO":
-                # IFZ_GOTO cond, None, label  -> CMP cond, 0 ; JE label
-                self.target_code.append(f"CMP {a1}, 0")
-                if res:
-                    self.target_code.append(f"JE {res}")
-                else:
-                    self.target_code.append(f"JE __UNKNOWN_LABEL__")
-                i += 1
-                continue
-
-            # GOTO -> JMP label
-            if op == "GOTO":
-                if a1:
-                    self.target_code.append(f"JMP {a1}")
-                i += 1
-                continue
-
-            # LABEL -> label:
-            if op == "LABEL":
-                if a1:
-                    self.target_code.append(f"{a1}:")
-                i += 1
-                continue
-
-            # MOV -> MOV dest, src
-            if op == "MOV":
-                # MOV src -> res (we store as MOV res, src)
-                # Avoid redundant MOV x, x
-                src = a1
-                dest = res
-                if src is None or dest is None:
-                    i += 1
-                    continue
-                if src == dest:
-                    # skip redundant
-                    i += 1
-                    continue
-                self.target_code.append(f"MOV {dest}, {src}")
-                i += 1
-                continue
-
-            # PRINT
-            if op == "PRINT":
-                self.target_code.append(f"PRINT {a1}")
-                i += 1
-                continue
-
-            # RET
-            if op == "RET":
-                self.target_code.append(f"RET {a1}")
-                i += 1
-                continue
-
-            # PARAM (push)
-            if op == "PARAM":
-                self.target_code.append(f"PUSH {a1}")
-                i += 1
-                continue
-
-            # CALL
-            if op == "CALL":
-                # CALL <name>, <nargs>
-                if a1:
-                    self.target_code.append(f"CALL {a1}, {a2 if a2 is not None else 0}")
-                else:
-                    self.target_code.append("CALL __UNKNOWN__, 0")
-                i += 1
-                continue
-
-            # POP
-            if op == "POP":
-                # POP dest
-                if res:
-                    self.target_code.append(f"POP {res}")
-                else:
-                    self.target_code.append("POP _")
-                i += 1
-                continue
-
-            # PARAM_DECL (no code)
-            if op == "PARAM_DECL":
-                i += 1
-                continue
-
-            # Fallback unknown ops
-            self.target_code.append(f"# Unsupported op: {op} {a1} {a2} {res}")
-            i += 1
-
+        self._analyze()
+        self._lower(0, len(self.tac))
         return self.target_code
 
+    def _analyze(self):
+        # Everything the handlers look up about the TAC as a whole, computed
+        # once before lowering: operand read counts, the label index and label
+        # merging, which result names are temps and which of those are dead,
+        # and which temp results only the next row reads. Each TAC column is
+        # read through an itemgetter and counted by Counter in C, not by a
+        # Python loop per row.
+        # PARAM_DECL and END_FUNC rows are dropped first, so neither the
+        # analysis nor the lowering loop ever sees them.
+        tac = self.tac = [instr for instr in self.optimized_tac if instr[0] not in _NOOP_OPS]
+        uses = self.use_count
+        uses.update(map(itemgetter(1), tac))
+        uses.update(map(itemgetter(2), tac))
+
+        label_rows = [idx for idx, instr in enumerate(tac) if instr[0] == "LABEL"]
+        labels = Counter(tac[idx][1] for idx in label_rows)
+        # a repeated label has no single target, so no loop uses it
+        self.label_index.update(
+            (tac[idx][1], idx if labels[tac[idx][1]] == 1 else None) for idx in label_rows)
+
+        # temps are pooled, so only the few distinct names need the string test
+        results = set(map(itemgetter(3), tac))
+        self.temp_names = {r for r in results if type(r) is str and is_temp(r)}
+        # variables are function locals, so a name read nowhere in the program
+        # is as dead as an unread temp
+        self.dead_stores = {r for r in results if r is not None and not uses[r]}
+        # a CALL without an argument count passes none
+        self.call_nargs = {idx: 0 if instr[2] is None else instr[2]
+                           for idx, instr in enumerate(tac) if instr[0] == "CALL"}
+
+        # Temps are pooled, so a name's read count says nothing about one of
+        # its values. Walking backwards with the set of names read before they
+        # are written again, a temp read by row j and not live after it was
+        # last read there; when row j - 1 wrote it, that value is computed
+        # straight into row j.
+        temps = self.temp_names
+        read_by_next = self.read_by_next
+        live = set()
+        for j in range(len(tac) - 1, 0, -1):
+            _, a1, a2, res = tac[j]
+            prev = tac[j - 1][3]
+            if (prev == a1 or prev == a2) and prev in temps and prev not in live:
+                read_by_next.add(j - 1)
+            live.discard(res)
+            live.add(a1)
+            live.add(a2)
+
+        # A label right after another one names the same position: jumps to
+        # it go to the first label of the run and it is not emitted. Loop
+        # headers keep their own name, since rotation moves their label.
+        self.loop_stop = len(self.tac)
+        alias = self.label_alias
+        for idx in label_rows:
+            name = tac[idx][1]
+            if name and idx and tac[idx - 1][0] == "LABEL" and labels[name] == 1:
+                prev = tac[idx - 1][1]
+                first = alias.get(prev, prev)
+                if first and labels[first] == 1 and self._loop_at(name, idx) is None:
+                    alias[name] = first
+
+    def _lower(self, i, stop):
+        # emit the TAC rows from i up to stop
+        tac = self.tac
+        handler_of = self._dispatch.get
+        unknown = self._emit_unknown
+        while i < stop:
+            op, a1, a2, res = tac[i]
+            i = handler_of(op, unknown)(op, a1, a2, res, i)
+
+    # Function label
+    def _emit_func(self, op, a1, a2, res, i):
+        if a1:
+            self.emit(f"{a1}:")
+        else:
+            self.emit("FUNC:")
+        return i + 1
+
+    # Arithmetic; a temp result copied by the next MOV and read nowhere else
+    # before it is written again is computed straight into the MOV's destination
+    def _arith_emitter(self, op):
+        # one handler per binop with its line template, fused jump and
+        # identity check bound, so a row does no lookups keyed by op;
+        # comparisons have no identities to test
+        template = self._ARITH_TEMPLATES[op]
+        jump_if_false = self._JUMP_IF_FALSE.get(op)
+        identity = _identity if op in ("PLUS", "MINUS", "MUL", "DIV") else None
+        emit = self.emit
+        emit_unknown = self._emit_unknown
+        emit_mov = self._emit_mov
+
+        def handler(op, a1, a2, res, i):
+            if not res:
+                return emit_unknown(op, a1, a2, res, i)
+
+            dest, following = res, i + 1
+            if i in self.read_by_next:
+                nop, na1, na2, nres = self.tac[i + 1]
+                if nop == "MOV" and na1 == res and nres:
+                    dest, following = nres, i + 2
+                # a 0/1 compare only tested by the IFZ_GOTO after it becomes
+                # one CMP and the inverse jump, with no temp materialized
+                elif nop == "IFZ_GOTO" and na1 == res and jump_if_false:
+                    self.emitx(("CMP %s, %s" % (a1, a2), f"{jump_if_false} {self._target(nres)}"))
+                    return i + 2
+
+            if dest in self.dead_stores:
+                # binops are pure: an unread result needs no code
+                return following
+
+            # Algebraic identities need no arithmetic: a copy (dropped when
+            # the destination is the operand itself) or a negation
+            simple = identity(op, a1, a2) if identity else None
+            if simple is None:
+                emit(template % (dest, a1, a2))
+            elif simple[0] == "MOV":
+                emit_mov("MOV", simple[1], None, dest, i)
+            else:
+                emit("NEG %s, %s" % (dest, simple[1]))
+            return following
+        return handler
+
+    # IFZ_GOTO -> CMP/JE sequence
+    def _emit_ifz_goto(self, op, a1, a2, res, i):
+        # IFZ_GOTO cond, None, label  -> CMP cond, 0 ; JE label
+        self.emitx(("CMP %s, 0" % (a1,), f"JE {self._target(res)}"))
+        return i + 1
+
+    # IF_NOT_<cmp> a, b, label -> CMP a, b ; jump on the inverse condition
+    def _emit_if_not(self, op, a1, a2, res, i):
+        jump = self._JUMP_IF_NOT[op]
+        self.emitx(("CMP %s, %s" % (a1, a2), f"{jump} {self._target(res)}"))
+        return i + 1
+
+    def _target(self, label):
+        # jump target once merged labels are resolved
+        return self.label_alias.get(label, label) or "__UNKNOWN_LABEL__"
+
+    # GOTO -> JMP label, dropped when the label is among the ones right after
+    def _emit_goto(self, op, a1, a2, res, i):
+        if a1:
+            target = self._target(a1)
+            tac = self.tac
+            j = i + 1
+            while j < len(tac) and tac[j][0] == "LABEL":
+                if self._target(tac[j][1]) == target:
+                    return i + 1
+                j += 1
+            self.emit(f"JMP {target}")
+        return i + 1
+
+    # LABEL -> label:
+    def _emit_label(self, op, a1, a2, res, i):
+        if a1 in self.label_alias:
+            return i + 1
+        if a1:
+            loop = self._loop_at(a1, i)
+            if loop is not None:
+                return self._emit_rotated_loop(a1, i, *loop)
+            self.emit(f"{a1}:")
+        return i + 1
+
+    def _loop_at(self, label, i):
+        # A while loop as codegen lays it out: LABEL S, a straight-line test
+        # ending in a forward branch to E, the body, GOTO S, LABEL E.
+        # Returns (index of the branch, index of LABEL E), else None.
+        tac = self.tac
+        branch = i + 1
+        while branch < len(tac) and tac[branch][0] in _PURE_OPS:
+            branch += 1
+        if branch >= len(tac):
+            return None
+        op, _, _, target = tac[branch]
+        # an IFZ_GOTO right after a compare is fused with it, so only a bare
+        # IFZ_GOTO is taken apart here
+        if not (op in self._JUMP_IF or (op == "IFZ_GOTO" and branch == i + 1)):
+            return None
+        end = self.label_index.get(target)
+        if end is None or not branch < end - 1 < self.loop_stop or tac[end - 1][:2] != ("GOTO", label):
+            return None
+        return branch, end
+
+    def _emit_rotated_loop(self, label, i, branch, end):
+        # Test at the bottom: the loop is entered by a jump to its test and
+        # each iteration ends in one backward branch, taken while the test
+        # holds, instead of a not-taken exit test plus an unconditional JMP
+        body = f"{label}_BODY"
+        self.emitx((f"JMP {label}", f"{body}:"))
+        outer_stop, self.loop_stop = self.loop_stop, end - 1
+        self._lower(branch + 1, end - 1)
+        self.loop_stop = outer_stop
+        self.emit(f"{label}:")
+        self._lower(i + 1, branch)
+        op, a1, a2, _ = self.tac[branch]
+        if op == "IFZ_GOTO":
+            self.emitx((f"CMP {a1}, 0", f"JNE {body}"))
+        else:
+            self.emitx((f"CMP {a1}, {a2}", f"{self._JUMP_IF[op]} {body}"))
+        return end
+
+    # MOV -> MOV dest, src
+    def _emit_mov(self, op, a1, a2, res, i):
+        # MOV src -> res (we store as MOV res, src)
+        # Avoid redundant MOV x, x
+        src = a1
+        dest = res
+        if src is None or dest is None or src == dest:
+            return i + 1
+        if dest in self.dead_stores:
+            # copy into a name nothing reads
+            return i + 1
+        line = "MOV %s, %s" % (dest, src)
+        # Right after MOV d, s both a repeat of it and the shuffle back
+        # MOV s, d are no-ops (a label in between would be the last line)
+        last = self.target_code[-1] if self.target_code else None
+        if last == line or last == "MOV %s, %s" % (src, dest):
+            return i + 1
+        self.emit(line)
+        return i + 1
+
+    # PRINT (PRINT_STR prints a string literal)
+    def _emit_print(self, op, a1, a2, res, i):
+        self.emit(f"PRINT {a1}")
+        return i + 1
+
+    # RET
+    def _emit_ret(self, op, a1, a2, res, i):
+        self.emit(f"RET {a1}")
+        return i + 1
+
+    # PARAM (push)
+    def _emit_param(self, op, a1, a2, res, i):
+        self.emit(f"PUSH {a1}")
+        return i + 1
+
+    # CALL
+    def _emit_call(self, op, a1, a2, res, i):
+        # CALL <name>, <nargs> (+ POP dest when the call has a result)
+        if a1:
+            self.emit("CALL %s, %s" % (a1, self.call_nargs[i]))
+        else:
+            self.emit("CALL __UNKNOWN__, 0")
+        if res:
+            self.emit(f"POP {res}")
+        return i + 1
+
+    # POP
+    def _emit_pop(self, op, a1, a2, res, i):
+        # POP dest
+        if res:
+            self.emit(f"POP {res}")
+        else:
+            self.emit("POP _")
+        return i + 1
+
+    # Fallback unknown ops
+    def _emit_unknown(self, op, a1, a2, res, i):
+        self.emit(f"# Unsupported op: {op} {a1} {a2} {res}")
+        return i + 1
+
     def display(self):
         print("\n[TARGET CODE]")
-        for line in self.target_code:
-            print("  ", line)
+        if self.target_code:
+            print("\n".join(["   " + line for line in self.target_code]))